@@ -1,10 +1,33 @@
 # base_client.py
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+import os
 import re
+import time
+import orjson
 from dataclasses import dataclass
+from functools import lru_cache
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from llm_cache import ResponseCache
 
-@dataclass
+# Patterns used on every line of every response - compiled once at import
+# Anchored via Pattern.match(line, pos) at the first non-blank character
+_NUMBERED = re.compile(r'(\d+)[.)]\s*(.+?)\s*$')
+_MD_STRIP = re.compile(r'[*\[\]]+')
+_URL_TAIL = re.compile(r'(.+?)\s*-\s*(https?://\S+)$')
+_URL_ANY = re.compile(r'https?://\S+')
+_URL_STRIP = re.compile(r'\s*https?://\S+\s*')
+_BOLD = re.compile(r'\*\*([^*]+)\*\*')
+# Leading phrases that mark a feature/description line rather than a product
+_REJECT = re.compile(
+    r'(?:features|includes|made from|equipped with|available in'
+    r'|comes with|designed|key features)',
+    re.IGNORECASE,
+)
+
+@dataclass(frozen=True, slots=True)
 class RankResult:
     """Represents a ranked item from AI response"""
     rank: int
@@ -12,7 +35,7 @@ class RankResult:
     description: Optional[str] = None
     source: Optional[str] = None
     
-@dataclass
+@dataclass(slots=True)
 class PlatformResponse:
     """Unified response model for all platforms"""
     platform: str
@@ -24,13 +47,82 @@ class PlatformResponse:
     cost: float
     web_search_used: bool = False
     error: Optional[str] = None
+    from_cache: bool = False
+    
+    @classmethod
+    def from_error(cls, platform: str, error: str, model: str = "") -> "PlatformResponse":
+        """Build the empty response recorded when a query fails"""
+        return cls(
+            platform=platform,
+            model=model,
+            raw_text="",
+            ranked_items=[],
+            input_tokens=0,
+            output_tokens=0,
+            cost=0.0,
+            error=error
+        )
+
+class _LiveRetry(Retry):
+    """Retry policy that never re-sends a paid Live POST the server may already have run"""
+    
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        # A POST is only retried when it was rejected up front by rate limiting
+        if method == "POST" and status_code != 429:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+def create_session(pool_connections: int = 32, pool_maxsize: int = 32,
+                   auth: Optional[Tuple[str, str]] = None) -> requests.Session:
+    """Create a session that keeps TLS connections to DataForSEO warm and retries transient errors"""
+    session = requests.Session()
+    if auth:
+        session.auth = auth
+        session.headers.update({"Content-Type": "application/json"})
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        # A failed connect is safe to retry once (nothing was sent), without backoff so an
+        # unreachable host fails fast. Read errors are never retried: the Live POSTs are billed
+        # and not idempotent, so a timeout or 5xx may already have been charged. POSTs retry on 429 only
+        max_retries=_LiveRetry(total=3, connect=1, read=0, backoff_factor=0.3,
+                               status_forcelist=(429, 500, 502, 503, 504),
+                               allowed_methods=frozenset(["GET", "POST"])),
+    )
+    session.mount("https://", adapter)
+    return session
 
 class BaseLLMClient(ABC):
     """Abstract base class for all LLM platform clients"""
     
-    def __init__(self, timeout_s: int = 120):
+    # How long a fetched model list is reused before list_models() hits the API again
+    MODELS_CACHE_TTL_S = 300
+    
+    # Every platform is served from the same DataForSEO host
+    base_url = "https://api.dataforseo.com"
+    
+    # What query() turns into an error response: transport errors (after the adapter's retries)
+    # and API/task/payload errors raised by _fetch_result; anything else is a bug and propagates
+    QUERY_ERRORS = (requests.RequestException, RuntimeError, KeyError)
+    
+    def __init__(self, 
+                 login: Optional[str] = None,
+                 password: Optional[str] = None,
+                 timeout_s: int = 120,
+                 cache: Optional[ResponseCache] = None,
+                 session: Optional[requests.Session] = None):
+        # A caller-supplied session (e.g. BaseLLMClient.shared_session) is used as-is
+        if session is None:
+            # Only fall back to the environment when a credential was not passed in
+            if not (login and password):
+                default_login, default_password = self.default_credentials()
+                login, password = login or default_login, password or default_password
+            session = create_session(auth=(login, password))
+        self.session = session
         self.timeout_s = timeout_s
+        self.cache = cache
         self.platform_name = self.__class__.__name__.replace("Client", "")
+        self._models_cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None
     
     @abstractmethod
     def list_models(self) -> List[Dict[str, Any]]:
@@ -46,45 +138,162 @@ class BaseLLMClient(ABC):
         """Query the platform with a keyword and return structured response"""
         pass
     
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def default_credentials() -> Tuple[str, str]:
+        """Read DataForSEO credentials from the environment once per process"""
+        return os.environ["DATAFORSEO_LOGIN"], os.environ["DATAFORSEO_PASSWORD"]
+    
+    @classmethod
+    @lru_cache(maxsize=None)
+    def shared_session(cls, login: str, password: str) -> requests.Session:
+        """Return one authenticated session per credential pair, reusable across platform clients"""
+        return create_session(auth=(login, password))
+    
+    def _fetch_result(self, url: str, task: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """POST one Live task and return (result, from_cache), using the response cache if configured"""
+        cache_key = self.cache.make_key(self.platform_name, task) if self.cache else None
+        if cache_key:
+            result = self.cache.get(cache_key)
+            if result is not None:
+                return result, True
+        
+        r = self.session.post(url, data=orjson.dumps([task]), timeout=self.timeout_s)
+        r.raise_for_status()
+        try:
+            data = orjson.loads(r.content)
+        except orjson.JSONDecodeError as e:
+            raise RuntimeError(f"Malformed API response: {e}") from e
+        self._assert_ok(data)
+        
+        results = data["tasks"][0].get("result")
+        if not isinstance(results, list) or not results or not isinstance(results[0], dict):
+            raise RuntimeError("Malformed API response: tasks[0].result[0] is missing or not an object")
+        result = results[0]
+        if cache_key:
+            self.cache.set(cache_key, result)
+        return result, False
+    
+    def _build_response(self, platform: str, model_name: str, result: Dict[str, Any],
+                        from_cache: bool, web_search_used: Optional[bool] = None) -> PlatformResponse:
+        """Turn a Live task result into a PlatformResponse"""
+        raw_text = self._extract_text(result)
+        
+        return PlatformResponse(
+            platform=platform,
+            model=model_name,
+            raw_text=raw_text,
+            ranked_items=self.extract_rankings(raw_text),
+            # Cached responses cost nothing and spend no tokens
+            input_tokens=0 if from_cache else result.get("input_tokens", 0),
+            output_tokens=0 if from_cache else result.get("output_tokens", 0),
+            cost=0.0 if from_cache else result.get("money_spent", 0.0),
+            web_search_used=result.get("web_search", False) if web_search_used is None else web_search_used,
+            from_cache=from_cache
+        )
+    
+    @staticmethod
+    def _assert_ok(payload: Dict[str, Any]) -> None:
+        if not isinstance(payload, dict):
+            raise RuntimeError("Malformed API response: expected a JSON object")
+        if payload.get("status_code") != 20000:
+            raise RuntimeError(f"DataForSEO API error: {payload.get('status_message')}")
+        tasks = payload.get("tasks")
+        if not isinstance(tasks, list) or not tasks or not isinstance(tasks[0], dict):
+            raise RuntimeError("Malformed API response: tasks[0] is missing or not an object")
+        task = tasks[0]
+        if task.get("status_code") != 20000:
+            raise RuntimeError(f"Task error: {task.get('status_message')}")
+    
+    def _cached_models(self) -> Optional[List[Dict[str, Any]]]:
+        """Return the last fetched model list if it is still within the TTL"""
+        if self._models_cache and time.monotonic() - self._models_cache[0] < self.MODELS_CACHE_TTL_S:
+            return self._models_cache[1]
+        return None
+    
+    def _store_models(self, models: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Remember a freshly fetched model list and return it"""
+        self._models_cache = (time.monotonic(), models)
+        return models
+    
+    def _extract_text(self, result: Dict[str, Any]) -> str:
+        """Extract plain text from a DataForSEO LLM response"""
+        text_parts = []
+        
+        # Items come under "items" (newer) or "content" (older)
+        for item in result.get("items") or result.get("content") or ():
+            sections = item.get("sections")
+            if sections:
+                # Sections are typed "text", or untyped with bare text
+                text_parts.extend(
+                    sec["text"] for sec in sections
+                    if sec.get("type") in ("text", None) and "text" in sec
+                )
+            elif "text" in item:
+                # An item without sections is itself the text block, whatever its type
+                text_parts.append(item["text"])
+        
+        return "\n\n".join(text_parts).strip()
+    
     def extract_rankings(self, text: str) -> List[RankResult]:
         """Extract ranked items from AI response text - optimized for strict format"""
+        return list(self._extract_rankings_cached(text))
+    
+    # Keyed on the class as well as the text, so a subclass overriding _is_likely_product_name
+    # gets its own cached results
+    @classmethod
+    @lru_cache(maxsize=512)
+    def _extract_rankings_cached(cls, text: str) -> Tuple[RankResult, ...]:
+        """Parse response text once per distinct string"""
         ranked_items = []
-        lines = text.split('\n')
+        lines = text.splitlines()
         
         for line in lines:
-            line = line.strip()
-            if not line:
+            # Peek at the first non-blank character without allocating a stripped copy;
+            # only lines starting with a digit can be numbered items
+            i, n = 0, len(line)
+            while i < n and line[i].isspace():
+                i += 1
+            if i == n or not line[i].isdigit():
                 continue
             
-            # Look for numbered items (1. Item or 1) Item)
-            numbered_match = re.match(r'^(\d+)[\.\)]\s*(.+)', line)
+            # Look for numbered items (1. Item or 1) Item); the pattern trims surrounding whitespace
+            numbered_match = _NUMBERED.match(line, i)
             if numbered_match:
                 rank = int(numbered_match.group(1))
-                item_text = numbered_match.group(2).strip()
+                item_text = numbered_match.group(2)
                 
-                # Remove any markdown formatting
-                item_text = re.sub(r'\*+', '', item_text)
-                item_text = re.sub(r'\[|\]', '', item_text)  # Remove brackets
-                item_text = item_text.strip()
+                # Remove any markdown formatting (bold markers and brackets)
+                item_text = _MD_STRIP.sub('', item_text).strip()
                 
                 # Extract URL if present (format: "Product Name - URL")
                 title = item_text
                 source_url = None
                 
-                # Look for URL pattern at the end
-                url_match = re.search(r'(.+?)\s*-\s*(https?://[^\s]+)$', item_text)
-                if url_match:
-                    title = url_match.group(1).strip()
-                    source_url = url_match.group(2).strip()
-                else:
-                    # Alternative: look for standalone URLs
-                    url_pattern = re.search(r'(https?://[^\s]+)', item_text)
-                    if url_pattern:
-                        source_url = url_pattern.group(1)
-                        title = re.sub(r'\s*(https?://[^\s]+)\s*', '', item_text).strip()
+                # Cheap substring check first - most lines carry no URL at all
+                if 'http' in item_text:
+                    # Fast path for the prompted "Product Name - URL" format; like the regexes,
+                    # it needs a single token with something after the scheme
+                    head, _, tail = item_text.rpartition(' - ')
+                    if (head and tail.startswith(('http://', 'https://'))
+                            and tail.partition('://')[2] and len(tail.split()) == 1):
+                        title = head.strip()
+                        source_url = tail
+                    else:
+                        # Look for URL pattern at the end
+                        url_match = _URL_TAIL.search(item_text)
+                        if url_match:
+                            title = url_match.group(1).strip()
+                            source_url = url_match.group(2)
+                        else:
+                            # Alternative: look for standalone URLs
+                            url_pattern = _URL_ANY.search(item_text)
+                            if url_pattern:
+                                source_url = url_pattern.group(0)
+                                title = _URL_STRIP.sub('', item_text).strip()
                 
                 # Skip if this looks like a description or feature
-                if self._is_likely_product_name(title):
+                if cls._is_likely_product_name(title):
                     ranked_items.append(RankResult(
                         rank=rank,
                         title=title,
@@ -93,73 +302,59 @@ class BaseLLMClient(ABC):
                     ))
         
         # If we got very few results, fallback to more lenient extraction
+        # (only non-compliant responses pay for the second pass)
         if len(ranked_items) < 3:
-            ranked_items = self._fallback_extraction(text)
+            ranked_items = []
+            for line in lines:
+                # Try to find product-like names with bold formatting (fallback format)
+                if '**' not in line:
+                    continue
+                bold_match = _BOLD.search(line)
+                if bold_match:
+                    title = bold_match.group(1).strip()
+                    
+                    # Extract URL if present in the same line
+                    url_pattern = _URL_ANY.search(line) if 'http' in line else None
+                    source_url = url_pattern.group(0) if url_pattern else None
+                    
+                    if cls._is_likely_product_name(title):
+                        ranked_items.append(RankResult(
+                            rank=len(ranked_items) + 1,
+                            title=title,
+                            description=None,
+                            source=source_url
+                        ))
         
-        # Remove duplicates
-        seen_titles = set()
-        unique_items = []
+        # Remove duplicates, keeping the first occurrence (dicts preserve insertion order);
+        # titles are already stripped during extraction, so casefold is the only copy made
+        unique_items = {}
         for item in ranked_items:
-            title_key = item.title.lower().strip()
-            if title_key not in seen_titles:
-                seen_titles.add(title_key)
-                unique_items.append(item)
+            title_key = item.title.casefold()
+            if title_key not in unique_items:
+                unique_items[title_key] = item
         
-        # Re-number items sequentially
-        for i, item in enumerate(unique_items, 1):
-            item.rank = i
-        
-        return unique_items
+        # Re-number items sequentially with fresh instances (RankResult is frozen so cached results stay intact)
+        return tuple(
+            RankResult(rank=i, title=item.title, description=item.description, source=item.source)
+            for i, item in enumerate(unique_items.values(), 1)
+        )
     
-    def _is_likely_product_name(self, text: str) -> bool:
+    @staticmethod
+    def _is_likely_product_name(text: str) -> bool:
         """Check if text is likely a product name"""
         if not text or len(text) < 3:
             return False
         
         # Reject obvious features/descriptions
-        text_lower = text.lower()
-        reject_patterns = [
-            'features', 'includes', 'made from', 'equipped with',
-            'available in', 'comes with', 'designed', 'key features'
-        ]
-        
-        for pattern in reject_patterns:
-            if text_lower.startswith(pattern):
-                return False
+        if _REJECT.match(text):
+            return False
         
         # Accept if reasonable length
         return 3 <= len(text) <= 100
     
-    def _fallback_extraction(self, text: str) -> List[RankResult]:
-        """Fallback extraction for non-compliant responses"""
-        ranked_items = []
-        lines = text.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Try to find product-like names with bold formatting
-            bold_match = re.search(r'\*\*([^\*]+)\*\*', line)
-            if bold_match:
-                title = bold_match.group(1).strip()
-                
-                # Extract URL if present in the same line
-                source_url = None
-                url_pattern = re.search(r'(https?://[^\s]+)', line)
-                if url_pattern:
-                    source_url = url_pattern.group(1)
-                
-                if self._is_likely_product_name(title):
-                    ranked_items.append(RankResult(
-                        rank=len(ranked_items) + 1,
-                        title=title,
-                        description=None,
-                        source=source_url
-                    ))
-        
-        return ranked_items
-    
-    def create_search_prompt(self, keyword: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def create_search_prompt(keyword: str) -> str:
         """Create a standardized prompt for ranking queries"""
         return (
             f"List top 10 {keyword} with URLs. Format: '1. Product Name - URL'. "
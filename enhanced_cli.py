@@ -3,8 +3,7 @@
 
 import argparse
 import sys
-from rank_tracker import KeywordRankTracker
-from multi_model_tracker import MultiModelTracker
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 def main():
@@ -86,6 +85,18 @@ Examples:
         help="Export results to JSON file"
     )
     
+    parser.add_argument(
+        "--include-raw-text",
+        action="store_true",
+        help="Keep each platform's full response text in the JSON export"
+    )
+    
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse identical API responses cached on disk for 24h (no repeat cost)"
+    )
+    
     parser.add_argument(
         "--quiet",
         action="store_true",
@@ -103,24 +114,34 @@ Examples:
         print(f"🔎 Web search: {'disabled' if args.no_web_search else 'enabled'}")
     
     try:
+        cache = None
+        if args.cache:
+            from llm_cache import ResponseCache
+            cache = ResponseCache()
+        
         if args.all_models:
             # Multi-model mode
             if not args.quiet:
                 print(f"🚀 Mode: Multi-model analysis")
                 print("\nQuerying all available models...")
             
-            tracker = MultiModelTracker()
+            # Imported here so --help and argument errors don't pay for the HTTP client stack
+            from multi_model_tracker import MultiModelTracker
+            tracker = MultiModelTracker(cache=cache)
             results = tracker.query_all_models(
                 keyword=args.keyword,
                 platforms=args.platforms,
                 web_search=not args.no_web_search
             )
             
+            # Compare once and share between the summary and the export
+            comparisons = tracker.compare_all_platforms(results)
+            
             if not args.quiet:
-                tracker.print_multi_model_summary(results)
+                tracker.print_multi_model_summary(results, comparisons)
             
             if args.export_json:
-                tracker.export_multi_model_results(results, args.export_json)
+                tracker.export_multi_model_results(results, args.export_json, comparisons)
                 if not args.quiet:
                     print(f"✅ Multi-model results exported to: {args.export_json}")
         
@@ -130,7 +151,8 @@ Examples:
                 print(f"⚡ Mode: Single model per platform")
                 print("\nQuerying platforms...")
             
-            tracker = KeywordRankTracker()
+            from rank_tracker import KeywordRankTracker
+            tracker = KeywordRankTracker(cache=cache)
             
             # Override specific models if provided
             model_overrides = {}
@@ -141,23 +163,32 @@ Examples:
             if args.gemini_model:
                 model_overrides['gemini'] = args.gemini_model
             
-            # Query with specific models
+            # Query with specific models (in parallel - each call is network-bound)
             results = {}
-            platforms = args.platforms or list(tracker.clients.keys())
+            platforms = [p for p in (args.platforms or tracker.clients.keys()) if p in tracker.clients]
             
-            for platform in platforms:
-                if platform in tracker.clients:
-                    model = model_overrides.get(platform)
+            with ThreadPoolExecutor(max_workers=max(len(platforms), 1)) as executor:
+                future_to_platform = {
+                    executor.submit(
+                        tracker.clients[platform].query,
+                        keyword=args.keyword,
+                        model_name=model_overrides.get(platform),
+                        web_search=not args.no_web_search
+                    ): platform
+                    for platform in platforms
+                }
+                
+                for future in as_completed(future_to_platform):
+                    platform = future_to_platform[future]
                     try:
-                        results[platform] = tracker.clients[platform].query(
-                            keyword=args.keyword,
-                            model_name=model,
-                            web_search=not args.no_web_search
-                        )
+                        results[platform] = future.result()
                     except Exception as e:
                         if not args.quiet:
                             print(f"❌ Error querying {platform}: {e}")
             
+            # Keep the requested platform order for display/export
+            results = {p: results[p] for p in platforms if p in results}
+            
             if not args.quiet:
                 tracker.print_results(results)
             
@@ -167,7 +198,7 @@ Examples:
                     print(f"✅ Results exported to CSV: {args.export_csv}")
             
             if args.export_json:
-                tracker.export_to_json(results, args.export_json)
+                tracker.export_to_json(results, args.export_json, include_raw_text=args.include_raw_text)
                 if not args.quiet:
                     print(f"✅ Results exported to JSON: {args.export_json}")
         
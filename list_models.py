@@ -1,6 +1,8 @@
 # list_models.py
 """List all available models for each platform"""
 
+from concurrent.futures import ThreadPoolExecutor
+from base_client import BaseLLMClient
 from chatgpt_client import ChatGPTClient
 from perplexity_client import PerplexityClient
 from gemini_client import GeminiClient
@@ -8,47 +10,41 @@ from gemini_client import GeminiClient
 def main():
     print("Fetching available models for each platform...\n")
     
-    # ChatGPT models
-    print("=" * 60)
-    print("CHATGPT MODELS:")
-    print("-" * 60)
+    # All three platforms live on the same host with the same credentials - share one connection pool
     try:
-        chatgpt = ChatGPTClient()
-        models = chatgpt.list_models()
-        for model in models:
-            print(f"  • {model.get('model_name')}")
-            if model.get('web_search_supported'):
-                print(f"    └─ Web search: ✓")
-    except Exception as e:
-        print(f"  Error: {e}")
+        session = BaseLLMClient.shared_session(*BaseLLMClient.default_credentials())
+    except KeyError as e:
+        print(f"Error: missing credential {e}")
+        return
     
-    # Perplexity models
-    print("\n" + "=" * 60)
-    print("PERPLEXITY MODELS:")
-    print("-" * 60)
-    try:
-        perplexity = PerplexityClient()
-        models = perplexity.list_models()
-        for model in models:
-            print(f"  • {model.get('model_name')}")
-            if model.get('web_search_supported'):
-                print(f"    └─ Web search: ✓")
-    except Exception as e:
-        print(f"  Error: {e}")
+    def fetch_models(client_cls):
+        return client_cls(session=session).list_models()
     
-    # Gemini models
-    print("\n" + "=" * 60)
-    print("GEMINI MODELS:")
-    print("-" * 60)
-    try:
-        gemini = GeminiClient()
-        models = gemini.list_models()
-        for model in models:
-            print(f"  • {model.get('model_name')}")
-            if model.get('web_search_supported'):
-                print(f"    └─ Web search: ✓")
-    except Exception as e:
-        print(f"  Error: {e}")
+    platforms = [
+        ("CHATGPT", ChatGPTClient),
+        ("PERPLEXITY", PerplexityClient),
+        ("GEMINI", GeminiClient),
+    ]
+    
+    # The three model lookups are independent network calls - run them concurrently
+    with ThreadPoolExecutor(max_workers=len(platforms)) as executor:
+        futures = {
+            name: executor.submit(fetch_models, client_cls)
+            for name, client_cls in platforms
+        }
+        
+        for i, (name, future) in enumerate(futures.items()):
+            # Buffer each platform's section so output stays grouped
+            lines = [("\n" if i else "") + "=" * 60, f"{name} MODELS:", "-" * 60]
+            try:
+                models = future.result(timeout=35)
+                for model in models:
+                    lines.append(f"  • {model.get('model_name')}")
+                    if model.get('web_search_supported'):
+                        lines.append(f"    └─ Web search: ✓")
+            except Exception as e:
+                lines.append(f"  Error: {e}")
+            print("\n".join(lines))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,82 @@
+# llm_cache.py
+"""Persistent exact-match cache for DataForSEO Live results"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+import orjson
+
+class ResponseCache:
+    """SQLite-backed cache of raw task results keyed by the exact request sent"""
+
+    def __init__(self, path: str = ".llm_cache.sqlite", ttl_s: int = 24 * 3600):
+        self.path = path
+        self.ttl_s = ttl_s
+        # Clients query from worker threads, so share one connection behind a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, stored_at REAL NOT NULL, result BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(platform: str, task: Dict[str, Any]) -> str:
+        """Hash the platform plus every task field"""
+        payload = orjson.dumps({"platform": platform, "task": task}, option=orjson.OPT_SORT_KEYS)
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for key, or None if missing, expired or unreadable"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT stored_at, result FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if time.time() - row[0] > self.ttl_s:
+                    # Expired rows are dropped as they are found so the file doesn't keep them
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                    return None
+        except sqlite3.Error:
+            # e.g. the file is locked by another run - treat it as a miss and query the API
+            return None
+        return orjson.loads(row[1])
+
+    def set(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a raw DataForSEO task result"""
+        now = time.time()
+        try:
+            with self._lock:
+                # Writes follow a paid API call, so sweeping expired rows here costs nothing noticeable
+                self._conn.execute("DELETE FROM responses WHERE stored_at < ?", (now - self.ttl_s,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, stored_at, result) VALUES (?, ?, ?)",
+                    (key, now, orjson.dumps(result)),
+                )
+                self._conn.commit()
+        except sqlite3.Error:
+            # The result was already fetched; failing to cache it must not fail the query
+            pass
+
+    def clear(self) -> None:
+        """Drop all cached results"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "ResponseCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -2,10 +2,15 @@
 """Enhanced tracker that can query multiple models per platform"""
 
 from rank_tracker import KeywordRankTracker
-from base_client import PlatformResponse
+from base_client import BaseLLMClient, PlatformResponse
+import sys
 from typing import Dict, List, Optional
-import json
-from datetime import datetime
+import orjson
+from pathlib import Path
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import defaultdict
+from itertools import islice
 
 class MultiModelTracker(KeywordRankTracker):
     """Extended tracker with multi-model support"""
@@ -32,6 +37,9 @@ class MultiModelTracker(KeywordRankTracker):
         ]
     }
     
+    # Upper bound on in-flight DataForSEO requests during a multi-model sweep
+    MAX_CONCURRENT_QUERIES = 8
+    
     def query_all_models(self, 
                         keyword: str,
                         platforms: Optional[List[str]] = None,
@@ -41,44 +49,54 @@ class MultiModelTracker(KeywordRankTracker):
         if platforms is None:
             platforms = list(self.clients.keys())
         
-        all_results = {}
+        # Resolve the platforms that can actually be queried (known client and model list) up front
+        active = [
+            (platform, self.PLATFORM_MODELS[platform])
+            for platform in dict.fromkeys(platforms)
+            if platform in self.clients and platform in self.PLATFORM_MODELS
+        ]
         
-        for platform in platforms:
-            if platform not in self.clients:
-                continue
-            
-            all_results[platform] = {}
-            models = self.PLATFORM_MODELS.get(platform, [])
-            
-            print(f"\n🔍 Querying {platform.upper()} models...")
+        all_results = {platform: {} for platform, _ in active}
+        # dict.fromkeys drops repeated model names (keeping order) so none is paid for twice
+        jobs = [
+            (platform, model)
+            for platform, models in active
+            for model in dict.fromkeys(models)
+        ]
+        
+        print(f"\n🔍 Querying {len(jobs)} models across {len(all_results)} platform(s)...")
+        
+        # Every query is an independent, network-bound Live call, so fan them all out
+        responses = {}
+        with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_QUERIES) as executor:
+            future_to_job = {
+                executor.submit(
+                    self.clients[platform].query,
+                    keyword=keyword,
+                    model_name=model,
+                    web_search=web_search
+                ): (platform, model)
+                for platform, model in jobs
+            }
             
-            for model in models:
-                print(f"  - Testing model: {model}")
+            for future in as_completed(future_to_job):
+                platform, model = future_to_job[future]
                 try:
-                    response = self.clients[platform].query(
-                        keyword=keyword,
-                        model_name=model,
-                        web_search=web_search
-                    )
-                    all_results[platform][model] = response
+                    response = future.result()
                     
                     if response.error:
-                        print(f"    ❌ Error: {response.error}")
+                        print(f"  ❌ {platform}/{model}: {response.error}")
                     else:
-                        print(f"    ✅ Found {len(response.ranked_items)} items (cost: ${response.cost:.4f})")
+                        print(f"  ✅ {platform}/{model}: Found {len(response.ranked_items)} items (cost: ${response.cost:.4f})")
                         
                 except Exception as e:
-                    print(f"    ❌ Failed: {str(e)}")
-                    all_results[platform][model] = PlatformResponse(
-                        platform=platform,
-                        model=model,
-                        raw_text="",
-                        ranked_items=[],
-                        input_tokens=0,
-                        output_tokens=0,
-                        cost=0.0,
-                        error=str(e)
-                    )
+                    print(f"  ❌ {platform}/{model} failed: {str(e)}")
+                    response = PlatformResponse.from_error(platform, str(e), model)
+                responses[(platform, model)] = response
+        
+        # Reassemble in PLATFORM_MODELS order regardless of completion order
+        for platform, model in jobs:
+            all_results[platform][model] = responses[(platform, model)]
         
         return all_results
     
@@ -92,7 +110,7 @@ class MultiModelTracker(KeywordRankTracker):
             "model_specific_items": {}
         }
         
-        all_items = {}
+        all_items = defaultdict(lambda: {"title": None, "models": []})
         
         for model, response in platform_results.items():
             if response.error:
@@ -109,42 +127,54 @@ class MultiModelTracker(KeywordRankTracker):
             }
             
             for item in response.ranked_items:
-                item_key = self.normalize_title(item.title)
-                if item_key not in all_items:
-                    all_items[item_key] = {
-                        "title": item.title,
-                        "models": []
-                    }
-                all_items[item_key]["models"].append(model)
+                entry = all_items[self.normalize_title(item.title)]
+                # First model to mention an item decides its display title
+                entry["title"] = entry["title"] or item.title
+                entry["models"].append(model)
         
         # Find consensus items (appearing in multiple models)
-        for item_key, data in all_items.items():
-            if len(data["models"]) > 1:
-                comparison["consensus_items"].append({
-                    "item": data["title"],
-                    "models": data["models"],
-                    "agreement_score": len(data["models"]) / len(platform_results)
-                })
+        model_count = len(platform_results)
+        comparison["consensus_items"] = [
+            {
+                "item": data["title"],
+                "models": data["models"],
+                "agreement_score": len(data["models"]) / model_count
+            }
+            for data in all_items.values() if len(data["models"]) > 1
+        ]
         
         # Sort consensus items by agreement score
         comparison["consensus_items"].sort(key=lambda x: x["agreement_score"], reverse=True)
         
         return comparison
     
+    def compare_all_platforms(self, 
+                              results: Dict[str, Dict[str, PlatformResponse]]) -> Dict[str, Dict]:
+        """Run compare_models_within_platform once for every platform in results"""
+        return {
+            platform: self.compare_models_within_platform(model_results)
+            for platform, model_results in results.items()
+        }
+    
     def export_multi_model_results(self, 
                                   results: Dict[str, Dict[str, PlatformResponse]], 
-                                  filename: str):
+                                  filename: str,
+                                  comparisons: Optional[Dict[str, Dict]] = None):
         """Export multi-model results to JSON"""
         
+        # Callers that already ran compare_all_platforms pass its result to skip recomputing it
+        if comparisons is None:
+            comparisons = self.compare_all_platforms(results)
+        
         export_data = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(timezone.utc),  # orjson writes datetimes as ISO 8601
             "platforms": {}
         }
         
         for platform, model_results in results.items():
             export_data["platforms"][platform] = {
                 "models": {},
-                "comparison": self.compare_models_within_platform(model_results)
+                "comparison": comparisons[platform]
             }
             
             for model, response in model_results.items():
@@ -156,50 +186,63 @@ class MultiModelTracker(KeywordRankTracker):
                     "items_count": len(response.ranked_items),
                     "top_5_items": [
                         {"rank": item.rank, "title": item.title}
-                        for item in response.ranked_items[:5]
+                        for item in islice(response.ranked_items, 5)
                     ]
                 }
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
+        Path(filename).write_bytes(orjson.dumps(export_data, option=orjson.OPT_INDENT_2))
         
         print(f"\n📄 Multi-model results exported to: {filename}")
     
-    def print_multi_model_summary(self, results: Dict[str, Dict[str, PlatformResponse]]):
+    def print_multi_model_summary(self, 
+                                  results: Dict[str, Dict[str, PlatformResponse]],
+                                  comparisons: Optional[Dict[str, Dict]] = None):
         """Print summary of multi-model results"""
         
-        print("\n" + "="*70)
-        print("MULTI-MODEL ANALYSIS SUMMARY")
-        print("="*70)
+        if comparisons is None:
+            comparisons = self.compare_all_platforms(results)
+        
+        # Collect the whole report and write it once instead of one print() per line
+        lines = []
+        out = lines.append
         
-        total_cost = 0
-        total_queries = 0
+        out("\n" + "="*70)
+        out("MULTI-MODEL ANALYSIS SUMMARY")
+        out("="*70)
         
         for platform, model_results in results.items():
-            print(f"\n📱 {platform.upper()}")
-            print("-" * 40)
-            
-            platform_cost = 0
-            successful_models = 0
+            out(f"\n📱 {platform.upper()}")
+            out("-" * 40)
             
             for model, response in model_results.items():
-                total_queries += 1
                 if not response.error:
-                    successful_models += 1
-                    platform_cost += response.cost
-                    total_cost += response.cost
-                    print(f"  ✅ {model}: {len(response.ranked_items)} items (${response.cost:.4f})")
+                    out(f"  ✅ {model}: {len(response.ranked_items)} items (${response.cost:.4f})")
                 else:
-                    print(f"  ❌ {model}: {response.error}")
+                    out(f"  ❌ {model}: {response.error}")
             
-            print(f"  Platform total: ${platform_cost:.4f} ({successful_models}/{len(model_results)} models)")
+            successful = [r for r in model_results.values() if not r.error]
+            platform_cost = sum(r.cost for r in successful)
+            out(f"  Platform total: ${platform_cost:.4f} ({len(successful)}/{len(model_results)} models)")
             
             # Show consensus items for this platform
-            comparison = self.compare_models_within_platform(model_results)
+            comparison = comparisons[platform]
             if comparison["consensus_items"]:
-                print(f"\n  🤝 Top consensus items (appearing in multiple models):")
+                out(f"\n  🤝 Top consensus items (appearing in multiple models):")
                 for item in comparison["consensus_items"][:3]:
-                    print(f"     - {item['item']} ({len(item['models'])} models agree)")
+                    out(f"     - {item['item']} ({len(item['models'])} models agree)")
+        
+        total_queries = sum(len(model_results) for model_results in results.values())
+        total_cost = sum(
+            r.cost
+            for model_results in results.values()
+            for r in model_results.values()
+            if not r.error
+        )
+        
+        out(f"\n💰 TOTAL COST: ${total_cost:.4f} across {total_queries} queries")
+        out(f"📊 Average cost per query: ${total_cost/total_queries:.4f}" if total_queries > 0 else "")
+        
+        parse_cache = BaseLLMClient._extract_rankings_cached.cache_info()
+        out(f"🧠 Ranking parse cache: {parse_cache.hits} hits / {parse_cache.misses} misses")
         
-        print(f"\n💰 TOTAL COST: ${total_cost:.4f} across {total_queries} queries")
-        print(f"📊 Average cost per query: ${total_cost/total_queries:.4f}" if total_queries > 0 else "")
\ No newline at end of file
+        sys.stdout.write("\n".join(lines) + "\n")
\ No newline at end of file
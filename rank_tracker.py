@@ -1,100 +1,131 @@
 # rank_tracker.py
 import asyncio
-import json
+import atexit
 import csv
-from typing import List, Dict, Any, Optional
+import sys
+import time
+import orjson
+from pathlib import Path
+from typing import ClassVar, List, Dict, Any, Optional, Tuple
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from dataclasses import replace
+from concurrent.futures import ThreadPoolExecutor
 from base_client import PlatformResponse, RankResult
+from llm_cache import ResponseCache
 from chatgpt_client import ChatGPTClient
 from perplexity_client import PerplexityClient
 from gemini_client import GeminiClient
 
+# Generic product words stripped before titles are compared across platforms
+_STOPWORDS = ('coffee', 'canister', 'container', 'jar', 'vault', 'storage')
+
 class KeywordRankTracker:
     """Orchestrates multi-platform keyword rank tracking"""
     
-    def __init__(self):
+    # Shared by every tracker and call so worker threads stay warm across keywords
+    # (threads are only started on first use; results are per call, so sharing is safe)
+    _POOL: ClassVar[ThreadPoolExecutor] = ThreadPoolExecutor(max_workers=8, thread_name_prefix="rank-tracker")
+    
+    # How long query_all_platforms reuses results for the same keyword/platforms/web search
+    RESULTS_CACHE_TTL_S = 3600
+    
+    def __init__(self, cache: Optional[ResponseCache] = None):
         self.clients = {
-            "chatgpt": ChatGPTClient(),
-            "perplexity": PerplexityClient(),
-            "gemini": GeminiClient()
+            "chatgpt": ChatGPTClient(cache=cache),
+            "perplexity": PerplexityClient(cache=cache),
+            "gemini": GeminiClient(cache=cache)
         }
         self.results_history = []
+        # (keyword, platforms, web_search) -> (fetched at, results); only error-free runs are kept
+        self._results_cache: Dict[Tuple[str, Tuple[str, ...], bool], Tuple[float, Dict[str, PlatformResponse]]] = {}
+        # (results, comparison) for the last compared results dict; holding the dict keeps its id valid
+        self._comparison_cache: Optional[Tuple[Dict[str, PlatformResponse], Dict[str, Any]]] = None
     
     def query_all_platforms(self, 
                            keyword: str,
                            platforms: Optional[List[str]] = None,
                            web_search: bool = True,
-                           parallel: bool = True) -> Dict[str, PlatformResponse]:
+                           parallel: bool = True,
+                           timestamp: Optional[datetime] = None,
+                           no_cache: bool = False) -> Dict[str, PlatformResponse]:
         """Query multiple platforms for keyword rankings"""
         
         if platforms is None:
             platforms = list(self.clients.keys())
         
-        results = {}
+        active = [platform for platform in platforms if platform in self.clients]
+        cache_key = (keyword.lower().strip(), tuple(sorted(active)), web_search)
+        
+        cached = None if no_cache else self._results_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < self.RESULTS_CACHE_TTL_S:
+            # Copies (RankResult is frozen, so a fresh list is enough) marked like response-cache
+            # hits: nothing was spent this time
+            results = {
+                platform: replace(
+                    cached[1][platform],
+                    ranked_items=list(cached[1][platform].ranked_items),
+                    input_tokens=0,
+                    output_tokens=0,
+                    cost=0.0,
+                    from_cache=True
+                )
+                for platform in active
+            }
+            self._record(keyword, results, timestamp)
+            return results
+        
+        def run(platform: str) -> PlatformResponse:
+            try:
+                return self.clients[platform].query(keyword, web_search=web_search)
+            except Exception as e:
+                print(f"Error querying {platform}: {e}")
+                return PlatformResponse.from_error(platform, str(e))
         
         if parallel:
             # Parallel execution for faster results
-            with ThreadPoolExecutor(max_workers=len(platforms)) as executor:
-                future_to_platform = {
-                    executor.submit(
-                        self.clients[platform].query, 
-                        keyword, 
-                        web_search=web_search
-                    ): platform 
-                    for platform in platforms if platform in self.clients
-                }
-                
-                for future in as_completed(future_to_platform):
-                    platform = future_to_platform[future]
-                    try:
-                        results[platform] = future.result()
-                    except Exception as e:
-                        print(f"Error querying {platform}: {e}")
-                        results[platform] = PlatformResponse(
-                            platform=platform,
-                            model="",
-                            raw_text="",
-                            ranked_items=[],
-                            input_tokens=0,
-                            output_tokens=0,
-                            cost=0.0,
-                            error=str(e)
-                        )
+            responses = list(self._POOL.map(run, active))
         else:
             # Sequential execution for debugging
-            for platform in platforms:
-                if platform in self.clients:
-                    try:
-                        results[platform] = self.clients[platform].query(keyword, web_search=web_search)
-                    except Exception as e:
-                        print(f"Error querying {platform}: {e}")
-                        results[platform] = PlatformResponse(
-                            platform=platform,
-                            model="",
-                            raw_text="",
-                            ranked_items=[],
-                            input_tokens=0,
-                            output_tokens=0,
-                            cost=0.0,
-                            error=str(e)
-                        )
-        
-        # Store results with timestamp
+            responses = [run(platform) for platform in active]
+        
+        results = dict(zip(active, responses))
+        
+        # Failed platforms should be retried next time, so only clean runs are cached
+        if not any(response.error for response in responses):
+            self._results_cache[cache_key] = (time.monotonic(), {
+                platform: replace(response, ranked_items=list(response.ranked_items))
+                for platform, response in results.items()
+            })
+        
+        self._record(keyword, results, timestamp)
+        return results
+    
+    def _record(self, keyword: str, results: Dict[str, PlatformResponse], timestamp: Optional[datetime]):
+        """Append a query to the history and drop the now-stale comparison"""
+        # New results make any memoized comparison stale
+        self._comparison_cache = None
+        
+        # Store results with timestamp (callers may pass the run time they also give the exports)
         self.results_history.append({
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": (timestamp or datetime.now()).isoformat(),
             "keyword": keyword,
             "results": results
         })
-        
-        return results
     
-    def normalize_title(self, title: str) -> str:
+    def clear_cache(self):
+        """Forget cached query_all_platforms results"""
+        self._results_cache.clear()
+    
+    # Cached: the same titles are normalized again and again across comparisons
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def normalize_title(title: str) -> str:
         """Normalize title for better comparison"""
         # Remove common words and clean up
         title = title.lower().strip()
         # Remove common suffixes/prefixes
-        for word in ['coffee', 'canister', 'container', 'jar', 'vault', 'storage']:
+        for word in _STOPWORDS:
             title = title.replace(word, '')
         # Remove extra whitespace
         title = ' '.join(title.split())
@@ -103,6 +134,8 @@ class KeywordRankTracker:
     def find_similar_items(self, title: str, items_dict: Dict[str, List]) -> List[str]:
         """Find similar items using fuzzy matching"""
         normalized = self.normalize_title(title)
+        # The left-hand word set is the same for every candidate
+        words = set(normalized.split())
         similar = []
         
         for other_title in items_dict.keys():
@@ -111,13 +144,13 @@ class KeywordRankTracker:
             if normalized in other_normalized or other_normalized in normalized:
                 similar.append(other_title)
             # Check if they share significant words
-            elif len(set(normalized.split()) & set(other_normalized.split())) >= 2:
+            elif len(words.intersection(other_normalized.split())) >= 2:
                 similar.append(other_title)
         
         return similar
     
-    def calculate_average_rankings(self, results: Dict[str, PlatformResponse]) -> Dict[str, float]:
-        """Calculate average ranking for items across platforms"""
+    def calculate_average_rankings(self, results: Dict[str, PlatformResponse]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Calculate average ranking for items across platforms as (title, data) pairs, best first"""
         item_rankings = {}
         
         for platform, response in results.items():
@@ -125,51 +158,46 @@ class KeywordRankTracker:
                 continue
             
             for item in response.ranked_items:
-                title_key = item.title.lower().strip()
+                # Similar titles share a normalized form, so that is the dict key
+                norm = self.normalize_title(item.title)
                 
-                # Find if this item or similar exists
-                if title_key not in item_rankings:
-                    # Check for similar items
-                    found_similar = False
-                    for existing_key in item_rankings.keys():
-                        if self.normalize_title(title_key) == self.normalize_title(existing_key):
-                            item_rankings[existing_key]['ranks'].append(item.rank)
-                            item_rankings[existing_key]['platforms'].append(platform)
-                            found_similar = True
-                            break
-                    
-                    if not found_similar:
-                        item_rankings[title_key] = {
-                            'title': item.title,
-                            'ranks': [item.rank],
-                            'platforms': [platform]
-                        }
+                if norm in item_rankings:
+                    item_rankings[norm]['ranks'].append(item.rank)
+                    item_rankings[norm]['platforms'].append(platform)
                 else:
-                    item_rankings[title_key]['ranks'].append(item.rank)
-                    item_rankings[title_key]['platforms'].append(platform)
-        
-        # Calculate averages
-        average_rankings = {}
-        for key, data in item_rankings.items():
-            avg_rank = sum(data['ranks']) / len(data['ranks'])
-            average_rankings[data['title']] = {
-                'average_rank': round(avg_rank, 2),
+                    item_rankings[norm] = {
+                        'title': item.title,
+                        'ranks': [item.rank],
+                        'platforms': [platform]
+                    }
+        
+        # Calculate averages (titles are distinct because their normalized forms are)
+        average_rankings = [
+            (data['title'], {
+                'average_rank': round(sum(data['ranks']) / len(data['ranks']), 2),
                 'appearances': len(data['ranks']),
                 'platforms': data['platforms'],
                 'individual_ranks': data['ranks']
-            }
+            })
+            for data in item_rankings.values()
+        ]
         
         # Sort by average rank
-        return dict(sorted(average_rankings.items(), key=lambda x: x[1]['average_rank']))
+        average_rankings.sort(key=lambda x: x[1]['average_rank'])
+        return average_rankings
     
     def compare_rankings(self, results: Dict[str, PlatformResponse]) -> Dict[str, Any]:
         """Compare rankings across platforms with improved matching"""
+        # Memoized for the last results dict (e.g. export_to_txt followed by print_results)
+        if self._comparison_cache is not None and self._comparison_cache[0] is results:
+            return self._comparison_cache[1]
+        
         comparison = {
             "summary": {},
             "items_by_platform": {},
             "common_items": [],
             "unique_items": {},
-            "average_rankings": {}
+            "average_rankings": []
         }
         
         all_items = {}
@@ -200,39 +228,28 @@ class KeywordRankTracker:
                     "description": item.description
                 })
                 
-                # Check for similar items
-                found_similar = False
-                for existing_key in all_items.keys():
-                    if self.normalize_title(item_key) == self.normalize_title(existing_key):
-                        all_items[existing_key].append(platform)
-                        found_similar = True
-                        break
-                
-                if not found_similar:
-                    if item_key not in all_items:
-                        all_items[item_key] = []
-                    all_items[item_key].append(platform)
+                # Similar titles share a normalized form; the first spelling seen is reported
+                norm = self.normalize_title(item_key)
+                if norm not in all_items:
+                    all_items[norm] = {"key": item_key, "platforms": []}
+                all_items[norm]["platforms"].append(platform)
         
         # Find common items across platforms
-        for item_key, platforms in all_items.items():
+        for entry in all_items.values():
+            platforms = entry["platforms"]
             if len(platforms) > 1:
                 comparison["common_items"].append({
-                    "item": item_key,
+                    "item": entry["key"],
                     "platforms": platforms,
                     "count": len(platforms)
                 })
         
         # Find unique items per platform
         for platform, items in platform_items.items():
-            unique = []
-            for item in items:
-                item_platforms = []
-                for key, plats in all_items.items():
-                    if self.normalize_title(item) == self.normalize_title(key):
-                        item_platforms.extend(plats)
-                        break
-                if len(set(item_platforms)) == 1:
-                    unique.append(item)
+            unique = [
+                item for item in items
+                if len(set(all_items[self.normalize_title(item)]["platforms"])) == 1
+            ]
             
             if unique:
                 comparison["unique_items"][platform] = unique
@@ -240,18 +257,15 @@ class KeywordRankTracker:
         # Add average rankings
         comparison["average_rankings"] = self.calculate_average_rankings(results)
         
+        self._comparison_cache = (results, comparison)
         return comparison
     
     def export_to_csv(self, results: Dict[str, PlatformResponse], filename: str):
         """Export results to CSV file"""
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['platform', 'rank', 'title', 'description', 'source', 'model', 'cost', 'web_search']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
+        def rows():
             for platform, response in results.items():
                 if response.error:
-                    writer.writerow({
+                    yield {
                         'platform': platform,
                         'rank': 'ERROR',
                         'title': response.error,
@@ -260,24 +274,37 @@ class KeywordRankTracker:
                         'model': response.model,
                         'cost': 0,
                         'web_search': False
-                    })
-                else:
-                    for item in response.ranked_items:
-                        writer.writerow({
-                            'platform': platform,
-                            'rank': item.rank,
-                            'title': item.title,
-                            'description': item.description or '',
-                            'source': item.source or '',
-                            'model': response.model,
-                            'cost': response.cost,
-                            'web_search': response.web_search_used
-                        })
+                    }
+                    continue
+                
+                # Per-platform fields are the same on every row
+                model = response.model
+                cost = response.cost
+                web_search = response.web_search_used
+                for item in response.ranked_items:
+                    yield {
+                        'platform': platform,
+                        'rank': item.rank,
+                        'title': item.title,
+                        'description': item.description or '',
+                        'source': item.source or '',
+                        'model': model,
+                        'cost': cost,
+                        'web_search': web_search
+                    }
+        
+        with open(filename, 'w', newline='', encoding='utf-8', buffering=1 << 16) as csvfile:
+            fieldnames = ['platform', 'rank', 'title', 'description', 'source', 'model', 'cost', 'web_search']
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            
+            writer.writeheader()
+            writer.writerows(rows())
     
-    def export_to_json(self, results: Dict[str, PlatformResponse], filename: str):
+    def export_to_json(self, results: Dict[str, PlatformResponse], filename: str, include_raw_text: bool = False,
+                       timestamp: Optional[datetime] = None):
         """Export results to JSON file"""
         export_data = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": (timestamp or datetime.now()).isoformat(),
             "results": {}
         }
         
@@ -289,20 +316,14 @@ class KeywordRankTracker:
                 "output_tokens": response.output_tokens,
                 "web_search_used": response.web_search_used,
                 "error": response.error,
-                "ranked_items": [
-                    {
-                        "rank": item.rank,
-                        "title": item.title,
-                        "description": item.description,
-                        "source": item.source
-                    }
-                    for item in response.ranked_items
-                ],
-                "raw_text": response.raw_text
+                # orjson serializes RankResult dataclasses natively (rank, title, description, source)
+                "ranked_items": response.ranked_items
             }
+            # Raw response text is usually the bulk of the file, so it is opt-in
+            if include_raw_text:
+                export_data["results"][platform]["raw_text"] = response.raw_text
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
+        Path(filename).write_bytes(orjson.dumps(export_data, option=orjson.OPT_INDENT_2))
     
     def generate_results_text(self, results: Dict[str, PlatformResponse]) -> str:
         """Generate formatted results text and return as string"""
@@ -334,7 +355,7 @@ class KeywordRankTracker:
         # Show average rankings
         output_lines.append("\n[RANKINGS] AVERAGE RANKINGS (sorted by best average):")
         output_lines.append("-" * 50)
-        for i, (title, data) in enumerate(list(comparison["average_rankings"].items())[:10], 1):
+        for i, (title, data) in enumerate(comparison["average_rankings"][:10], 1):
             output_lines.append(f"{i}. {title}")
             output_lines.append(f"   Average Rank: {data['average_rank']} | Appears on: {data['appearances']} platform(s)")
             output_lines.append(f"   Individual ranks: {data['individual_ranks']} ({', '.join(data['platforms'])})")
@@ -348,7 +369,8 @@ class KeywordRankTracker:
         
         return "\n".join(output_lines)
     
-    def export_to_txt(self, results: Dict[str, PlatformResponse], keyword: str):
+    def export_to_txt(self, results: Dict[str, PlatformResponse], keyword: str,
+                      timestamp: Optional[datetime] = None):
         """Export results to text file named after the keyword"""
         # Clean the keyword to create a valid filename
         clean_keyword = "".join(c for c in keyword if c.isalnum() or c in (' ', '-', '_')).rstrip()
@@ -361,7 +383,7 @@ class KeywordRankTracker:
         # Add header with timestamp and keyword
         header = f"Keyword Rank Tracker Results\n"
         header += f"Keyword: {keyword}\n"
-        header += f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        header += f"Timestamp: {(timestamp or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')}\n"
         header += "=" * 60 + "\n\n"
         
         with open(filename, 'w', encoding='utf-8') as f:
@@ -371,40 +393,7 @@ class KeywordRankTracker:
     
     def print_results(self, results: Dict[str, PlatformResponse]):
         """Print formatted results to console"""
-        for platform, response in results.items():
-            print(f"\n{'='*60}")
-            print(f"Platform: {platform.upper()}")
-            print(f"Model: {response.model}")
-            print(f"Cost: ${response.cost:.4f}")
-            print(f"Tokens: {response.input_tokens} in / {response.output_tokens} out")
-            print(f"Web Search: {response.web_search_used}")
-            
-            if response.error:
-                print(f"ERROR: {response.error}")
-            else:
-                print(f"\nTop Rankings:")
-                for item in response.ranked_items[:5]:  # Show top 5
-                    print(f"  {item.rank}. {item.title}")
-                    if item.source:
-                        print(f"     Source: {item.source}")
-                    if item.description:
-                        print(f"     {item.description[:100]}...")
-        
-        print(f"\n{'='*60}")
-        print("COMPARISON & ANALYSIS")
-        comparison = self.compare_rankings(results)
-        
-        # Show average rankings
-        print("\n[RANKINGS] AVERAGE RANKINGS (sorted by best average):")
-        print("-" * 50)
-        for i, (title, data) in enumerate(list(comparison["average_rankings"].items())[:10], 1):
-            print(f"{i}. {title}")
-            print(f"   Average Rank: {data['average_rank']} | Appears on: {data['appearances']} platform(s)")
-            print(f"   Individual ranks: {data['individual_ranks']} ({', '.join(data['platforms'])})")
-        
-        print("\n[COMMON] Common items across platforms:")
-        for common in comparison["common_items"][:5]:
-            print(f"  - {common['item']} (found on: {', '.join(common['platforms'])})")
-        
-        total_cost = sum(r.cost for r in results.values() if not r.error)
-        print(f"\n[COST] Total cost: ${total_cost:.4f}")
\ No newline at end of file
+        # Same report as the .txt export, emitted in a single write
+        sys.stdout.write(self.generate_results_text(results) + "\n")
+
+atexit.register(KeywordRankTracker._POOL.shutdown)
@@ -152,20 +152,140 @@ def test_average_rankings():
     avg_rankings = tracker.calculate_average_rankings(mock_results)
     
     print("\nAverage Rankings:")
-    for title, data in avg_rankings.items():
+    for title, data in avg_rankings:
         print(f"  - {title}")
         print(f"    Average Rank: {data['average_rank']}")
         print(f"    Platforms: {', '.join(data['platforms'])}")
         print(f"    Individual Ranks: {data['individual_ranks']}")
     
+    # compare_rankings is memoized for the last results dict it was given
+    comparison = tracker.compare_rankings(mock_results)
+    assert comparison["average_rankings"] == avg_rankings
+    assert tracker.compare_rankings(mock_results) is comparison
+    assert tracker.compare_rankings(dict(mock_results)) is not comparison
+    print("  [OK] Repeated comparisons of the same results are reused")
+    
     print("\n[OK] Average rankings test complete")
 
+def test_response_cache():
+    """Test response cache keys, TTL and pruning"""
+    print("\n" + "="*60)
+    print("TEST 5: Response Cache")
+    print("="*60)
+    
+    import os
+    import tempfile
+    from llm_cache import ResponseCache
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.sqlite")
+        
+        # Keys depend on every task field but not on dict order
+        task = {"user_prompt": "best coffee jar", "model_name": "sonar", "max_output_tokens": 800}
+        key = ResponseCache.make_key("Perplexity", task)
+        assert key == ResponseCache.make_key("Perplexity", dict(reversed(list(task.items()))))
+        assert key != ResponseCache.make_key("ChatGPT", task)
+        assert key != ResponseCache.make_key("Perplexity", {**task, "max_output_tokens": 400})
+        
+        with ResponseCache(path) as cache, ResponseCache(path, ttl_s=-1) as expired:
+            assert cache.get(key) is None
+            cache.set(key, {"money_spent": 0.01, "items": []})
+            assert cache.get(key) == {"money_spent": 0.01, "items": []}
+            print("  [OK] Hit after set, keys are order-independent and field-sensitive")
+            
+            # With a negative TTL everything is already expired: misses drop the row
+            assert expired.get(key) is None
+            assert cache.get(key) is None
+            
+            # ... and writes sweep any other expired rows
+            cache.set("old", {})
+            expired.set("new", {})
+        
+        with ResponseCache(path, ttl_s=10**9) as forever:
+            assert forever.get("old") is None
+            assert forever.get("new") == {}
+        print("  [OK] Expired entries miss and are pruned")
+        
+        # A database error behaves like a miss and never fails the caller
+        broken = ResponseCache(path)
+        broken.close()
+        assert broken.get("new") is None
+        broken.set("newer", {})
+        print("  [OK] Database errors fall back to a miss")
+    
+    print("\n[OK] Response cache test complete")
+
+def test_results_cache():
+    """Test query_all_platforms result reuse, TTL, no_cache and clear_cache"""
+    print("\n" + "="*60)
+    print("TEST 6: Results Cache")
+    print("="*60)
+    
+    from base_client import PlatformResponse, RankResult
+    
+    class StubClient:
+        """Offline stand-in for a platform client that counts its queries"""
+        def __init__(self, platform):
+            self.platform = platform
+            self.calls = 0
+        
+        def query(self, keyword, web_search=True):
+            self.calls += 1
+            return PlatformResponse(
+                platform=self.platform,
+                model="stub",
+                raw_text="1. Fellow Atmos",
+                ranked_items=[RankResult(1, "Fellow Atmos")],
+                input_tokens=100,
+                output_tokens=200,
+                cost=0.01
+            )
+    
+    tracker = KeywordRankTracker()
+    stubs = {platform: StubClient(platform) for platform in ("chatgpt", "perplexity")}
+    tracker.clients = dict(stubs)
+    
+    def calls():
+        return [stub.calls for stub in stubs.values()]
+    
+    first = tracker.query_all_platforms("best coffee jar")
+    assert calls() == [1, 1] and first["chatgpt"].cost == 0.01 and not first["chatgpt"].from_cache
+    
+    # Same keyword (case and spacing ignored): served from the cache as free copies
+    second = tracker.query_all_platforms("  Best Coffee Jar ")
+    assert calls() == [1, 1]
+    for platform, response in second.items():
+        assert response.from_cache
+        assert response.cost == 0.0 and response.input_tokens == 0 and response.output_tokens == 0
+        assert response.ranked_items == first[platform].ranked_items
+        assert response is not first[platform] and response.ranked_items is not first[platform].ranked_items
+    assert not first["chatgpt"].from_cache and first["chatgpt"].cost == 0.01
+    print("  [OK] Repeated keywords return zero-cost from_cache copies")
+    
+    tracker.query_all_platforms("best coffee jar", no_cache=True)
+    assert calls() == [2, 2]
+    print("  [OK] no_cache=True always queries")
+    
+    tracker.clear_cache()
+    tracker.query_all_platforms("best coffee jar")
+    assert calls() == [3, 3]
+    print("  [OK] clear_cache() forgets earlier results")
+    
+    tracker.RESULTS_CACHE_TTL_S = -1
+    tracker.query_all_platforms("best coffee jar")
+    assert calls() == [4, 4]
+    print("  [OK] Expired results are queried again")
+    
+    print("\n[OK] Results cache test complete")
+
 if __name__ == "__main__":
     print("\n=== Running Keyword Rank Tracker Tests ===\n")
     
     # Run tests
     test_rank_extraction()
     test_average_rankings()
+    test_response_cache()
+    test_results_cache()
     test_specific_models()
     
     # Run full test (costs money)
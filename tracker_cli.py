@@ -2,7 +2,9 @@
 import argparse
 import sys
 from rank_tracker import KeywordRankTracker
+from llm_cache import ResponseCache
 from datetime import datetime
+from functools import partial
 
 def main():
     parser = argparse.ArgumentParser(
@@ -62,6 +64,18 @@ Examples:
         help="Export results to JSON file"
     )
     
+    parser.add_argument(
+        "--include-raw-text",
+        action="store_true",
+        help="Keep each platform's full response text in the JSON export"
+    )
+    
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse identical API responses cached on disk for 24h (no repeat cost)"
+    )
+    
     parser.add_argument(
         "--quiet",
         action="store_true",
@@ -77,7 +91,7 @@ Examples:
     args = parser.parse_args()
     
     # Initialize tracker
-    tracker = KeywordRankTracker()
+    tracker = KeywordRankTracker(cache=ResponseCache() if args.cache else None)
     
     # Override models if specified
     if args.models:
@@ -91,11 +105,19 @@ Examples:
         for platform, model in model_mapping.items():
             if platform in tracker.clients:
                 original_query = tracker.clients[platform].query
-                tracker.clients[platform].query = lambda k, m=model, ws=not args.no_web_search, mt=800, oq=original_query: oq(k, model_name=m, web_search=ws, max_tokens=mt)
+                tracker.clients[platform].query = partial(
+                    original_query,
+                    model_name=model,
+                    web_search=not args.no_web_search,
+                    max_tokens=800
+                )
+    
+    # One run time for the console header, the history entry and every export
+    run_at = datetime.now()
     
     if not args.quiet:
         print(f"\n[*] Tracking keyword: '{args.keyword}'")
-        print(f"[*] Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"[*] Timestamp: {run_at.strftime('%Y-%m-%d %H:%M:%S')}")
         platforms_str = ", ".join(args.platforms) if args.platforms else "all platforms"
         print(f"[*] Querying: {platforms_str}")
         print(f"[*] Web search: {'disabled' if args.no_web_search else 'enabled'}")
@@ -108,7 +130,8 @@ Examples:
             keyword=args.keyword,
             platforms=args.platforms,
             web_search=not args.no_web_search,
-            parallel=not args.sequential
+            parallel=not args.sequential,
+            timestamp=run_at
         )
         
         # Print results to console
@@ -123,13 +146,14 @@ Examples:
         
         # Export to JSON if requested
         if args.export_json:
-            tracker.export_to_json(results, args.export_json)
+            tracker.export_to_json(results, args.export_json, include_raw_text=args.include_raw_text,
+                                   timestamp=run_at)
             if not args.quiet:
                 print(f"[+] Results exported to JSON: {args.export_json}")
         
         # Export to text file if requested
         if args.txt:
-            txt_filename = tracker.export_to_txt(results, args.keyword)
+            txt_filename = tracker.export_to_txt(results, args.keyword, timestamp=run_at)
             if not args.quiet:
                 print(f"[+] Results exported to text file: {txt_filename}")
         